@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 
 from app.models.users import User as UserModel
-from app.config import SECRET_KEY, ALGORITHM
+from app.config import settings
 from app.db_depends import get_async_db
 
 
@@ -45,7 +45,7 @@ def create_access_token(data: dict):
         "exp": expire,
         "token_type": "access",
     })
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, settings.secret_key.get_secret_value(), algorithm=settings.algorithm)
 
 
 
@@ -59,7 +59,7 @@ def create_refresh_token(data: dict):
         "exp": expire,
         "token_type": "refresh",
     })
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, settings.secret_key.get_secret_value(), algorithm=settings.algorithm)
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme),
@@ -73,7 +73,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme),
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, settings.secret_key.get_secret_value(), algorithms=[settings.algorithm])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -0,0 +1,55 @@
+"""
+Одноразовое заполнение rating_sum, rating_count и rating по активным отзывам.
+
+Запускать после добавления колонок и до приёма новых отзывов:
+    python -m app.backfill_ratings
+Повторный запуск безопасен: значения каждый раз пересчитываются из таблицы reviews.
+"""
+import asyncio
+
+from loguru import logger
+from sqlalchemy import Numeric, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker, make_async_engine
+from app.models import Product as ProductModel
+from app.models.reviews import Review as ReviewModel
+
+
+async def backfill_ratings(db: AsyncSession) -> int:
+    """
+    Пересчитывает счётчики рейтинга всех товаров одним UPDATE и возвращает число обновлённых строк.
+    """
+    active_reviews = (ReviewModel.product_id == ProductModel.id, ReviewModel.is_active == True)
+    grade_sum = (
+        select(func.coalesce(func.sum(ReviewModel.grade), 0)).where(*active_reviews).scalar_subquery()
+    )
+    grade_count = select(func.count()).where(*active_reviews).scalar_subquery()
+    result = await db.execute(
+        update(ProductModel)
+        .values(
+            rating_sum=grade_sum,
+            rating_count=grade_count,
+            rating=func.coalesce(cast(grade_sum, Numeric(10, 2)) / func.nullif(grade_count, 0), 0),
+            # Служебный пересчёт не должен менять дату изменения товара
+            updated_at=ProductModel.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def main() -> None:
+    engine = make_async_engine()
+    async_session_maker.configure(bind=engine)
+    try:
+        async with async_session_maker() as db:
+            updated = await backfill_ratings(db)
+        logger.info(f"Rating backfill: {updated} products updated")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,12 +1,31 @@
-import os
+from pathlib import Path
 
-from dotenv import load_dotenv
+from pydantic import SecretStr
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-load_dotenv()
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = "HS256"
+# .env в корне проекта, независимо от рабочей директории при запуске
+ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
 
-YOOKASSA_SHOP_ID = os.getenv("YOOKASSA_SHOP_ID")
-YOOKASSA_SECRET_KEY = os.getenv("YOOKASSA_SECRET_KEY")
-YOOKASSA_RETURN_URL = os.getenv("YOOKASSA_RETURN_URL", "http://localhost:8000/")
\ No newline at end of file
+
+class Settings(BaseSettings):
+    """
+    Настройки приложения из переменных окружения и файла .env.
+    """
+    secret_key: SecretStr
+    algorithm: str = "HS256"
+
+    # Строка, а не PostgresDsn: он отклоняет DSN с Unix-сокетом
+    # (postgresql+asyncpg://user@/db?host=/run/postgresql)
+    database_url: str
+    # Логирование SQL только для локальной отладки
+    sql_echo: bool = False
+
+    yookassa_shop_id: str | None = None
+    yookassa_secret_key: SecretStr | None = None
+    yookassa_return_url: str = "http://localhost:8000/"
+
+    model_config = SettingsConfigDict(env_file=ENV_FILE, extra="ignore")
+
+
+settings = Settings()
@@ -1,30 +1,14 @@
-from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends
 
-from collections.abc import Generator, AsyncGenerator
+from collections.abc import AsyncGenerator
 
-from app.database import SessionLocal, async_session_maker
+from app.database import async_session_maker
 
 
 
-
-def get_db() -> Generator[Session, None, None]:
-    """
-    Зависимость для получения сессии базы данных.
-    Создаёт новую сессию для каждого запроса и закрывает её после обработки.
-    """
-    db: Session = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        
-        
-
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Предоставляет асинхронную сессию SQLAlchemy для работы с базой данных PostgreSQL.
     """
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -1,21 +1,79 @@
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
 from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from loguru import logger
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import Message, Receive, Scope, Send
 
+from app.database import async_session_maker, make_async_engine, warm_up_pool
+from app.payments import make_yookassa_client
 from app.routers import categories, products, users, reviews, cart, orders, payments
 
 
 logger.add("info.log", format="Log: [{extra[log_id]}:{time} - {level} - {message}]", level="INFO", 
            enqueue=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Создаёт движок БД и HTTP-клиент YooKassa при старте, закрывает соединения при остановке.
+    """
+    engine = make_async_engine()
+    async_session_maker.configure(bind=engine)
+    try:
+        # Пул закрывается и при ошибке прогрева (например, БД недоступна)
+        await warm_up_pool(engine)
+        async with make_yookassa_client() as http:
+            app.state.http = http
+            yield
+    finally:
+        await engine.dispose()
+
+
+class JSONGZipResponder(GZipResponder):
+    """
+    Сжимает только JSON, остальные ответы (картинки из /media и т.п.) отдаёт как есть.
+    """
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            await super().send_with_compression(message)
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.content_type_is_excluded = not content_type.startswith("application/json")
+            return
+        await super().send_with_compression(message)
+
+
+class JSONGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        responder: IdentityResponder
+        if "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = JSONGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+
+        await responder(scope, receive, send)
+
+
 app = FastAPI(
     title="FastAPI Интернет-магазин",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# Сжатие JSON-ответов больше 500 байт (списки отзывов и т.п.), мелкие ответы и статика отдаются как есть
+app.add_middleware(JSONGZipMiddleware, minimum_size=500, compresslevel=5)
+
 @app.middleware("http")
 async def log_middleware(request: Request, call_next):
     log_id = str(uuid4())
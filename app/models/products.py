@@ -2,7 +2,7 @@ from datetime import datetime
 from decimal import Decimal
 
 from sqlalchemy import String, Boolean, Integer, Numeric, ForeignKey, select, DateTime, func, Computed, \
-    Index
+    Index, CheckConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import TSVECTOR
 
@@ -18,6 +18,10 @@ class Product(Base):
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     rating: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False, default=0.00)
+    # Сумма и количество оценок активных отзывов: rating пересчитывается за O(1).
+    # После добавления колонок заполнить существующие товары: python -m app.backfill_ratings
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     image_url: Mapped[str | None] = mapped_column(String(200), nullable=True)
     stock: Mapped[int] = mapped_column(Integer, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -52,4 +56,6 @@ class Product(Base):
     
     __table_args__ = (
         Index("ix_products_tsv_gin", "tsv", postgresql_using="gin"),
+        CheckConstraint("rating_sum >= 0", name="ck_products_rating_sum_non_negative"),
+        CheckConstraint("rating_count >= 0", name="ck_products_rating_count_non_negative"),
     )
\ No newline at end of file
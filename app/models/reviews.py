@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Numeric, ForeignKey, Text, DateTime, Boolean
+from sqlalchemy import Numeric, ForeignKey, Text, DateTime, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -18,4 +18,11 @@ class Review(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     
     user: Mapped["User"] = relationship("User", back_populates="reviews")
-    product: Mapped["Product"] = relationship("Product", back_populates="reviews")
\ No newline at end of file
+    product: Mapped["Product"] = relationship("Product", back_populates="reviews")
+    
+    __table_args__ = (
+        # Отзывы товара (список и ETag-статистика) выбираются по product_id и is_active
+        Index("ix_reviews_product_active", "product_id", "is_active"),
+        # Keyset-пагинация списка отзывов по дате
+        Index("ix_reviews_active_comment_date", "comment_date", "id", postgresql_where=text("is_active")),
+    )
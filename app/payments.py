@@ -2,18 +2,59 @@ from typing import Any
 from decimal import Decimal # Точная работа с деньгами
 from uuid import uuid4 # Для уникального idempotence_key (предотвращает дубли платежей)
 
-from anyio import to_thread # Для запуска синхронного кода в async
-from yookassa import Configuration, Payment
+import httpx # Асинхронный HTTP-клиент: запросы к API без отдельного потока
+import orjson # Быстрая сериализация payload в JSON
+from fastapi import Request
 
-from app.config import (
-    YOOKASSA_RETURN_URL,
-    YOOKASSA_SECRET_KEY,
-    YOOKASSA_SHOP_ID,
-)
+from app.config import settings
+
+
+YOOKASSA_API_URL = "https://api.yookassa.ru"
+
+# Неизменные части payload платежа собираются один раз при импорте
+_BASE_PAYLOAD: dict[str, Any] = {
+    "confirmation": { # Как подтвердить платёж
+        "type": "redirect", # Пользователь перенаправляется на форму Yookassa
+        "return_url": settings.yookassa_return_url, # Куда вернуть пользователя после оплаты
+    },
+    "capture": True, # Автоматическое списание денег после авторизации
+}
+
+_BASE_RECEIPT_ITEM: dict[str, Any] = {
+    "quantity": "1.00", # Количество (строка)
+    "vat_code": 1, # НДС: 1=без НДС (0%), 2=0%, 3=10%, 4=20%, 5=расчетный, 6=спецрежим
+    "payment_mode": "full_prepayment", # Режим: полная предоплата
+    "payment_subject": "commodity", # Тип: "service"=услуга, "commodity"=товар или заказ
+}
+
+
+def make_yookassa_client() -> httpx.AsyncClient:
+    """
+    Создаёт общий клиент для API YooKassa (Basic Auth, keep-alive соединения).
+    HTTP/2 позволяет вести несколько платежей по одному TCP+TLS соединению.
+    """
+    auth = None
+    if settings.yookassa_shop_id and settings.yookassa_secret_key:
+        auth = (settings.yookassa_shop_id, settings.yookassa_secret_key.get_secret_value())
+    return httpx.AsyncClient(
+        base_url=YOOKASSA_API_URL,
+        auth=auth,
+        http2=True,
+        timeout=httpx.Timeout(10.0, connect=3.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+
+
+def get_yookassa_client(request: Request) -> httpx.AsyncClient:
+    """
+    Возвращает клиент YooKassa, созданный в lifespan приложения.
+    """
+    return request.app.state.http
 
 
 async def create_yookassa_payment(
     *, # Только именованные аргументы
+    client: httpx.AsyncClient, # Общий клиент из lifespan (app.state.http)
     order_id: int, # ID заказа из БД
     amount: Decimal, # Сумма (для точности используется Decimal)
     user_email: str, # Email для чека
@@ -21,26 +62,17 @@ async def create_yookassa_payment(
     ) -> dict[str, Any]: # Возврат в виде словаря (json)
     
     # Проверка настроек (fallback на ошибку)
-    if not YOOKASSA_SHOP_ID or not YOOKASSA_SECRET_KEY:
+    if not settings.yookassa_shop_id or not settings.yookassa_secret_key:
         raise RuntimeError("Задайте YOOKASSA_SHOP_ID и YOOKASSA_SECRET_KEY в .env")
     
-    # Глобальная настройка SDK (Basic Auth под капотом)
-    Configuration.account_id = YOOKASSA_SHOP_ID
-    Configuration.secret_key = YOOKASSA_SECRET_KEY
-    
+    amount_value = f"{amount:.2f}" # str(Decimal) - обязательная строка: "100.00"
+    amount_field = {"value": amount_value, "currency": "RUB"}
     
     # Формирование Payload - это главная часть.
-    # Это JSON для POST-запроса /v3/payments.
+    # Это JSON для POST-запроса /v3/payments; неизменные поля берутся из заготовок модуля.
     payload = {
-        "amount": { # Сумма платежа
-            "value": f"{amount:.2f}", # str(Decimal) - обязательная строка: "100.00"
-            "currency": "RUB",
-        },
-        "confirmation": { # Как подтвердить платёж
-            "type": "redirect", # Пользователь перенаправляется на форму Yookassa
-            "return_url": YOOKASSA_RETURN_URL, # Куда вернуть пользователя после оплаты  
-        },
-        "capture": True, # Автоматическое списание денег после авторизации
+        **_BASE_PAYLOAD,
+        "amount": amount_field, # Сумма платежа
         "description": description, # Видно пользователю в истории
         "metadata": { # Мои данные (сохраняются в платеже)
             "order_id": order_id, # Связь с заказом из БД
@@ -53,42 +85,51 @@ async def create_yookassa_payment(
                 # Список товаров/услуг (здесь 1 item = весь наш заказ)
                 # Но также можно передать и каждую позицию отдельно.
                 {
+                    **_BASE_RECEIPT_ITEM,
                     "description": description[:128], # Максимальное кол-во символов - 128.
-                    "quantity": "1.00", # Количество (строка)
-                    "amount": { # Сумма item
-                        "value": f"{amount:.2f}",
-                        "currency": "RUB",
-                        
-                    },
-                    "vat_code": 1, # НДС: 1=без НДС (0%), 2=0%, 3=10%, 4=20%, 5=расчетный, 6=спецрежим
-                    "payment_mode": "full_prepayment", # Режим: полная предоплата
-                    "payment_subject": "commodity", # Тип: "service"=услуга, "commodity"=товар или заказ 
+                    "amount": amount_field, # Сумма item
                 },
             ],
         },
     }
     
-    # Вспомогательная синхронная функция для создания платежа
-    def _request() -> Payment:
-        # Payment.create(payload, idempotence_key) - POST-запрос к API Yookassa
-        # uuid4(): - уникальный ключ, если повтор - вернет существующий платеж (идемпотентность)
-        return Payment.create(payload, str(uuid4()))
-    
-    # Вызов в thread (библиотека YooKassa синхронная, а FastAPI - асинхронный)
-    payment: Payment = await to_thread.run_sync(_request)
+    # POST-запрос к API Yookassa
+    # uuid4(): - уникальный ключ, если повтор - вернет существующий платеж (идемпотентность).
+    # Повторный checkout клиента отсекается раньше, по Order.idempotency_key.
+    response = await client.post(
+        "/v3/payments",
+        content=orjson.dumps(payload),
+        headers={
+            "Content-Type": "application/json",
+            "Idempotence-Key": str(uuid4()),
+        },
+    )
+    response.raise_for_status()
+    return _payment_info(response.json())
+
+
+async def get_yookassa_payment(
+    *, # Только именованные аргументы
+    client: httpx.AsyncClient, # Общий клиент из lifespan (app.state.http)
+    payment_id: str # ID платежа в YooKassa (Order.payment_id)
+    ) -> dict[str, Any]:
     
+    # GET-запрос к API Yookassa: текущий статус и ссылка на оплату уже созданного платежа
+    response = await client.get(f"/v3/payments/{payment_id}")
+    response.raise_for_status()
+    return _payment_info(response.json())
+
+
+def _payment_info(payment: dict[str, Any]) -> dict[str, Any]:
     # Извлечение URL для оплаты
-    confirmation_url = getattr(payment.confirmation, "confirmation_url", None)
+    confirmation_url = (payment.get("confirmation") or {}).get("confirmation_url")
     
     # Возврат данных для фронта/БД
     return {
         # ID платежа, полученного от YooKassa
-        "id": payment.id,
+        "id": payment["id"],
         # Статус платежа, пока он будет "pending"
-        "status": payment.status,
+        "status": payment["status"],
         # Ссылка на оплату (сюда пользователя перенаправит для оплаты)
         "confirmation_url": confirmation_url,
     }
-        
-    
-     
@@ -1,7 +1,7 @@
 from decimal import Decimal
 
 from fastapi import APIRouter, HTTPException, status, Depends, Response
-from sqlalchemy import delete, select
+from sqlalchemy import delete, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -25,14 +25,13 @@ router = APIRouter(
 
 
 async def _ensure_product_available(db: AsyncSession, product_id: int) -> None:
-    result = await db.scalars(
-        select(ProductModel).where(
+    product_exists = await db.scalar(
+        select(exists().where(
             ProductModel.id == product_id,
             ProductModel.is_active == True,
-        )
+        ))
     )
-    product = result.first()
-    if not product:
+    if not product_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found or inactive",
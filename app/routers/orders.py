@@ -1,7 +1,9 @@
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import httpx
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -11,7 +13,7 @@ from app.models.cart_items import CartItem as CartItemModel
 from app.models.orders import Order as OrderModel, OrderItem as OrderItemModel
 from app.models.users import User as UserModel
 from app.schemas import Order as OrderSchema, OrderList, OrderCheckoutResponse
-from app.payments import create_yookassa_payment
+from app.payments import create_yookassa_payment, get_yookassa_client, get_yookassa_payment
 
 
 router = APIRouter(
@@ -31,15 +33,52 @@ async def _load_order_with_items(db: AsyncSession, order_id: int) -> OrderModel
     return result.first()
 
 
+async def _load_order_by_idempotency_key(db: AsyncSession, user_id: int, key: str) -> OrderModel | None:
+    result = await db.scalars(
+        select(OrderModel)
+        .options(
+            selectinload(OrderModel.items).selectinload(OrderItemModel.product),
+        )
+        .where(OrderModel.user_id == user_id, OrderModel.idempotency_key == key)
+    )
+    return result.first()
+
+
+async def _repeat_checkout(order: OrderModel, http_client: httpx.AsyncClient) -> OrderCheckoutResponse:
+    """
+    Ответ на повторный checkout: уже созданный заказ и актуальная ссылка на его оплату.
+    """
+    confirmation_url = None
+    if order.payment_id:
+        try:
+            payment_info = await get_yookassa_payment(client=http_client, payment_id=order.payment_id)
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Не удалось получить данные оплаты",
+            ) from exc
+        confirmation_url = payment_info.get("confirmation_url")
+    return OrderCheckoutResponse(order=order, confirmation_url=confirmation_url)
+
+
 @router.post("/checkout", response_model=OrderCheckoutResponse, status_code=status.HTTP_201_CREATED)
 async def checkout_order(
     db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
+    http_client: httpx.AsyncClient = Depends(get_yookassa_client),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", max_length=64),
 ):
     """
     Создаёт заказ на основе текущей корзины пользователя.
     Сохраняет позиции заказа, вычитает остатки и очищает корзину.
+    Idempotency-Key (до 64 символов) сохраняется в заказе: повторный запрос с тем же ключом
+    возвращает уже созданный заказ и ссылку на его оплату, не создавая новый платёж.
     """
+    if idempotency_key:
+        existing_order = await _load_order_by_idempotency_key(db, current_user.id, idempotency_key)
+        if existing_order is not None:
+            return await _repeat_checkout(existing_order, http_client)
+
     cart_result = await db.execute(
         select(CartItemModel)
         .options(selectinload(CartItemModel.product))
@@ -50,7 +89,7 @@ async def checkout_order(
     if not cart_items:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cart is empty")
 
-    order = OrderModel(user_id=current_user.id)
+    order = OrderModel(user_id=current_user.id, idempotency_key=idempotency_key)
     total_amount = Decimal("0")
 
     for cart_item in cart_items:
@@ -88,9 +127,22 @@ async def checkout_order(
     order.total_amount = total_amount
     db.add(order)
     
+    user_id = current_user.id # После rollback объекты сессии истекают
     try:
         await db.flush()
+    except IntegrityError:
+        # Параллельный запрос с тем же Idempotency-Key уже создал заказ
+        await db.rollback()
+        if not idempotency_key:
+            raise
+        existing_order = await _load_order_by_idempotency_key(db, user_id, idempotency_key)
+        if existing_order is None:
+            raise
+        return await _repeat_checkout(existing_order, http_client)
+    
+    try:
         payment_info = await create_yookassa_payment(
+            client=http_client,
             order_id=order.id,
             amount=order.total_amount,
             user_email=current_user.email,
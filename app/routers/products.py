@@ -2,8 +2,9 @@ import uuid
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
-from sqlalchemy import select, update, desc, func, and_
+from sqlalchemy import select, update, desc, func, and_, exists
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from app.models.categories import Category as CategoryModel
 from app.models.products import Product as ProductModel
@@ -12,7 +13,7 @@ from app.models.users import User as UserModel
 from app.auth import get_current_seller
 
 
-from app.db_depends import get_db, get_async_db 
+from app.db_depends import get_async_db
 
 
 
@@ -119,6 +120,7 @@ async def get_all_products(
     if rank_col is not None:
         products_stmt = (
             select(ProductModel, rank_col)
+            .options(raiseload("*"))
             .where(*filters)
             .order_by(desc(rank_col), ProductModel.id)
             .offset((page - 1) * page_size)
@@ -131,6 +133,7 @@ async def get_all_products(
     else:
         products_stmt = (
             select(ProductModel)
+            .options(raiseload("*"))
             .where(*filters)
             .order_by(ProductModel.id)
             .offset((page - 1) * page_size)
@@ -153,11 +156,11 @@ async def create_product(product: ProductCreate = Depends(ProductCreate.as_form)
     """
     Создает новый товар, привязанный к текущему продавцу (только для "seller").
     """
-    category_result = await db.scalars(
-        select(CategoryModel).where(CategoryModel.id == product.category_id,
-                                    CategoryModel.is_active == True)
+    category_exists = await db.scalar(
+        select(exists().where(CategoryModel.id == product.category_id,
+                              CategoryModel.is_active == True))
     )
-    if not category_result.first():
+    if not category_exists:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Category not found or inactive")
         
@@ -179,14 +182,14 @@ async def get_products_by_category(category_id: int, db: AsyncSession = Depends(
     """
     Возвращает список товаров в указанной категории по её ID.
     """
-    stmt_category = await db.scalars(select(CategoryModel).where(CategoryModel.id == category_id, 
-                                                CategoryModel.is_active == True))
-    category = stmt_category.first()
-    if category is None:
+    category_exists = await db.scalar(select(exists().where(CategoryModel.id == category_id,
+                                                            CategoryModel.is_active == True)))
+    if not category_exists:
         raise HTTPException(status_code=404, detail="Category not found or inactive")
     
-    stmt_product = await db.scalars(select(ProductModel).where(ProductModel.category_id == category_id,
-                                              ProductModel.is_active == True))
+    stmt_product = await db.scalars(select(ProductModel).options(raiseload("*"))
+                                    .where(ProductModel.category_id == category_id,
+                                           ProductModel.is_active == True))
     products = stmt_product.all()
     return products
 
@@ -202,12 +205,11 @@ async def get_product(product_id: int, db: AsyncSession = Depends(get_async_db))
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found or inactive")
     
-    category = await db.scalars(
-        select(CategoryModel).where(CategoryModel.id == product.category_id,
-                                    CategoryModel.is_active == True)
+    category_exists = await db.scalar(
+        select(exists().where(CategoryModel.id == product.category_id,
+                              CategoryModel.is_active == True))
     )
-    category_stmt = category.first()
-    if category_stmt is None:
+    if not category_exists:
         raise HTTPException(status_code=400, detail="Category not found or inactive")
     return product
 
@@ -228,11 +230,11 @@ async def update_product(product_id: int,
     if db_product.seller_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, 
                             detail="You can only update your own products")
-    category_result = await db.scalars(
-        select(CategoryModel).where(CategoryModel.id == product.category_id,
-                                    CategoryModel.is_active == True)
+    category_exists = await db.scalar(
+        select(exists().where(CategoryModel.id == product.category_id,
+                              CategoryModel.is_active == True))
     )
-    if not category_result.first():
+    if not category_exists:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Category not found or inactive")
     await db.execute(
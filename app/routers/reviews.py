@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, update, func
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import (select, insert, update, func, exists, literal, cast, bindparam, tuple_, Integer, Numeric, Text,
+                        DateTime, Update)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.categories import Category as CategoryModel
 from app.models.products import Product as ProductModel
 from app.models.reviews import Review as ReviewModel
-from app.schemas import Review as ReviewSchema, ReviewCreate
+from app.schemas import Review as ReviewSchema, ReviewCreate, ReviewList
 from app.models.users import User as UserModel
 from app.auth import get_current_buyer, get_current_user
 
@@ -15,31 +19,122 @@ from app.db_depends import get_async_db
 router = APIRouter(
     prefix="/reviews",
     tags=["reviews"],
+    default_response_class=ORJSONResponse,
+)
+
+
+# Колонки, нужные схеме ReviewSchema: выборка без создания ORM-объектов
+REVIEW_COLUMNS = (
+    ReviewModel.id,
+    ReviewModel.user_id,
+    ReviewModel.product_id,
+    ReviewModel.comment,
+    ReviewModel.comment_date,
+    ReviewModel.grade,
+    ReviewModel.is_active,
+)
+
+# Горячие SELECT собираются один раз при импорте, значения передаются через bindparam
+ALL_REVIEWS_STMT = (
+    select(*REVIEW_COLUMNS)
+    .where(ReviewModel.is_active == True)
+    .order_by(ReviewModel.comment_date.desc(), ReviewModel.id.desc())
+    .limit(bindparam("limit", type_=Integer()))
+)
+# Курсор (comment_date, id): отзывы с одинаковой датой на границе страницы не теряются
+ALL_REVIEWS_AFTER_STMT = ALL_REVIEWS_STMT.where(
+    tuple_(ReviewModel.comment_date, ReviewModel.id)
+    < tuple_(bindparam("after", type_=DateTime()), bindparam("after_id", type_=Integer()))
+)
+
+_PRODUCT_REVIEWS_FILTERS = (
+    ProductModel.id == bindparam("product_id", type_=Integer()),
+    ProductModel.is_active == True,
+    ReviewModel.is_active == True,
 )
+PRODUCT_REVIEWS_STATS_STMT = (
+    select(func.max(ReviewModel.comment_date), func.count())
+    .select_from(ReviewModel)
+    .join(ProductModel)
+    .where(*_PRODUCT_REVIEWS_FILTERS)
+)
+PRODUCT_REVIEWS_STMT = select(*REVIEW_COLUMNS).join(ProductModel).where(*_PRODUCT_REVIEWS_FILTERS)
+ACTIVE_PRODUCT_EXISTS_STMT = select(
+    exists().where(ProductModel.id == bindparam("product_id", type_=Integer()),
+                   ProductModel.is_active == True)
+)
+
+
+def _rating_update(product_id: int, grade_delta: int, count_delta: int) -> Update:
+    """
+    Инкрементально меняет сумму и количество оценок товара и пересчитывает рейтинг.
+    Отрицательные счётчики отклоняются CHECK-ограничениями таблицы products.
+    """
+    new_sum = ProductModel.rating_sum + grade_delta
+    new_count = ProductModel.rating_count + count_delta
+    return (
+        update(ProductModel)
+        .where(ProductModel.id == product_id)
+        .values(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=func.coalesce(cast(new_sum, Numeric(10, 2)) / func.nullif(new_count, 0), 0),
+        )
+    )
 
 
-@router.get("/", response_model=list[ReviewSchema])
-async def get_all_reviews(db: AsyncSession = Depends(get_async_db)):
+@router.get("/", response_model=ReviewList)
+async def get_all_reviews(limit: int = Query(50, ge=1, le=200),
+                          after: datetime | None = Query(
+                              None, description="Вернуть отзывы, оставленные раньше этой даты"),
+                          after_id: int | None = Query(
+                              None, ge=1, description="ID последнего отзыва предыдущей страницы"),
+                          db: AsyncSession = Depends(get_async_db)):
     """
-    Возвращает список всех отзывов.
+    Возвращает отзывы от новых к старым с keyset-пагинацией по (дате, ID).
     """
-    stmt = await db.scalars(select(ReviewModel).where(ReviewModel.is_active == True))
-    reviews = stmt.all()
-    return reviews
+    if after is None:
+        result = await db.execute(ALL_REVIEWS_STMT, {"limit": limit})
+    else:
+        if after.tzinfo is not None:
+            # comment_date хранится без часового пояса в локальном времени (datetime.now)
+            after = after.astimezone().replace(tzinfo=None)
+        # Без after_id берутся все отзывы строго раньше after: ID начинаются с 1
+        result = await db.execute(ALL_REVIEWS_AFTER_STMT,
+                                  {"limit": limit, "after": after, "after_id": after_id or 0})
+    reviews = result.mappings().all()
+    if len(reviews) < limit:
+        return {"items": reviews, "next": None, "next_id": None}
+    return {"items": reviews, "next": reviews[-1]["comment_date"], "next_id": reviews[-1]["id"]}
 
 
 @router.get("/products/{product_id}/", response_model=list[ReviewSchema])
-async def get_all_reviews_of_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+async def get_all_reviews_of_product(product_id: int,
+                                     request: Request,
+                                     response: Response,
+                                     db: AsyncSession = Depends(get_async_db)):
     """
     Возвращает список отзывов указанного товара.
+    Поддерживает ETag: при совпадении If-None-Match отвечает 304 без тела.
     """
-    product = await db.scalars(select(ProductModel).where(ProductModel.id == product_id,
-                                                          ProductModel.is_active == True))
-    if product.first() is None:
-        raise HTTPException(status_code=404, detail="Product not found or inactive")
-    stmt = await db.scalars(select(ReviewModel).where(ReviewModel.product_id == product_id,
-                                                      ReviewModel.is_active == True))
-    reviews_of_product = stmt.all()
+    params = {"product_id": product_id}
+    stats = await db.execute(PRODUCT_REVIEWS_STATS_STMT, params)
+    last_date, total = stats.one()
+    if not total:
+        # Нет отзывов: отличаем товар без отзывов от отсутствующего товара
+        product_exists = await db.scalar(ACTIVE_PRODUCT_EXISTS_STMT, params)
+        if not product_exists:
+            raise HTTPException(status_code=404, detail="Product not found or inactive")
+        return []
+
+    # Список меняется только при создании/удалении отзыва: дата последнего и количество
+    etag = f'W/"{last_date.timestamp() if last_date else 0}-{total}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    result = await db.execute(PRODUCT_REVIEWS_STMT, params)
+    reviews_of_product = result.mappings().all()
     return reviews_of_product
 
 
@@ -50,28 +145,28 @@ async def create_review(comment: ReviewCreate,
     """
     Создаёт отзыв, привязанный к указанному товару.
     """
-    stmt = await db.scalars(select(ProductModel).where(ProductModel.id == comment.product_id,
-                                                       ProductModel.is_active == True))
-    product = stmt.first()
-    if product is None:
-        raise HTTPException(status_code=404, detail="Product not found or inactive")
-    
-    
-    db_review = ReviewModel(**comment.model_dump(), user_id=current_user.id)
-    db.add(db_review)
-
-
-    result = await db.execute(
-        select(func.avg(ReviewModel.grade)).where(
-            ReviewModel.product_id == comment.product_id,
-            ReviewModel.is_active == True
+    # INSERT ... SELECT: строка вставляется только если товар существует и активен
+    insert_stmt = (
+        insert(ReviewModel)
+        .from_select(
+            ["user_id", "product_id", "comment", "comment_date", "grade"],
+            select(
+                literal(current_user.id, Integer()),
+                ProductModel.id,
+                literal(comment.comment, Text()),
+                literal(datetime.now(), DateTime()),
+                literal(comment.grade, Integer()),
+            ).where(ProductModel.id == comment.product_id, ProductModel.is_active == True),
         )
+        .returning(*REVIEW_COLUMNS)
     )
-    avg_rating = result.scalar() or 0.0
-    product = await db.get(ProductModel, comment.product_id)
-    product.rating = avg_rating
+    db_review = (await db.execute(insert_stmt)).mappings().first()
+    if db_review is None:
+        raise HTTPException(status_code=404, detail="Product not found or inactive")
+
+    # Счётчики рейтинга меняются в той же транзакции, что и сам отзыв
+    await db.execute(_rating_update(comment.product_id, comment.grade, 1))
     await db.commit()
-    await db.refresh(db_review)
     return db_review
 
 
@@ -82,27 +177,22 @@ async def delete_review(review_id: int,
     """
     Выполняет мягкое удаление отзыва.
     """
-    stmt = await db.scalars(select(ReviewModel).where(ReviewModel.id == review_id,
-                                     ReviewModel.is_active == True))
-    review = stmt.first()
+    # Мягкое удаление одним UPDATE ... RETURNING без загрузки ORM-объекта
+    result = await db.execute(
+        update(ReviewModel)
+        .where(ReviewModel.id == review_id, ReviewModel.is_active == True)
+        .values(is_active=False)
+        .returning(ReviewModel.product_id, ReviewModel.user_id, ReviewModel.grade)
+    )
+    review = result.first()
     if not review:
         raise HTTPException(status_code=404, detail="Review not found or inactive")
 
     if review.user_id != current_user.id and current_user.role != "admin":
+        await db.rollback()
         raise HTTPException(status_code=403, detail="User is not admin or author")
     
-    review.is_active = False
-    
-    result = await db.execute(
-        select(func.avg(ReviewModel.grade)).where(
-            ReviewModel.product_id == review.product_id,
-            ReviewModel.is_active == True
-        )
-    )
-    avg_rating = result.scalar() or 0.0
-    product = await db.get(ProductModel, review.product_id)
-    product.rating = avg_rating
+    await db.execute(_rating_update(review.product_id, -review.grade, -1))
     await db.commit()
-    await db.refresh(review)
     return {"Message": "Review deleted"}
     
\ No newline at end of file
@@ -8,7 +8,7 @@ from app.models.users import User as UserModel
 from app.schemas import UserCreate, User as UserSchema, RefreshTokenRequest
 from app.db_depends import get_async_db
 from app.auth import hash_password, verify_password, create_access_token, create_refresh_token
-from app.config import SECRET_KEY, ALGORITHM
+from app.config import settings
 
 
 router = APIRouter(
@@ -73,7 +73,7 @@ async def refresh_token(body: RefreshTokenRequest, db: AsyncSession = Depends(ge
     )
     old_refresh_token = body.refresh_token
     try:
-        payload = jwt.decode(old_refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(old_refresh_token, settings.secret_key.get_secret_value(), algorithms=[settings.algorithm])
         email: str | None = payload.get("sub")
         token_type: str | None = payload.get("token_type")
         
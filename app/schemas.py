@@ -119,6 +119,15 @@ class Review(BaseModel):
     comment_date: datetime
     grade: float
     is_active: bool
+
+
+class ReviewList(BaseModel):
+    """
+    Страница отзывов с курсором для следующего запроса.
+    """
+    items: list[Review] = Field(description="Отзывы на текущей странице")
+    next: datetime | None = Field(None, description="Значение after для следующей страницы")
+    next_id: int | None = Field(None, description="Значение after_id для следующей страницы")
     
     
 class CartItemBase(BaseModel):